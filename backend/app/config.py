@@ -16,4 +16,21 @@ class Settings:
         
     DATABASE_URL: str = _db_url
 
+    # Shared secret for /api/admin endpoints (sent as X-Admin-Token); admin routes are disabled when unset
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+
+    # Live game sessions expire this many seconds after their last heartbeat
+    LIVE_GAME_TIMEOUT: float = float(os.getenv("LIVE_GAME_TIMEOUT", "30"))
+    LIVE_GAME_TICK: float = float(os.getenv("LIVE_GAME_TICK", "1"))
+
+    # Width (in points) of the per-mode score histogram buckets used for percentiles
+    SCORE_BUCKET_WIDTH: int = int(os.getenv("SCORE_BUCKET_WIDTH", "10"))
+
+    # Opt-in request profiling (see app/profiling.py)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SAMPLE_RATE: float = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+    PROFILING_SLOW_MS: float = float(os.getenv("PROFILING_SLOW_MS", "250"))
+    PROFILING_BUFFER_SIZE: int = int(os.getenv("PROFILING_BUFFER_SIZE", "100"))
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+
 settings = Settings()
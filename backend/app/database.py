@@ -1,13 +1,21 @@
-from datetime import datetime
-from typing import List, Optional
+import asyncio
+import contextlib
+import time
+import uuid
+from datetime import datetime, date
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy import select, desc, func
+from sqlalchemy import select, desc, func, union_all
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import selectinload
 
-from .models import User, LeaderboardEntry, LiveGame, GameMode
+from .models import User, LeaderboardEntry, LiveGame, GameMode, UserSearchResult, ScoreStats, HomeResponse
 from .db_models import Base, UserDB, ScoreDB
 from .config import settings
 from .security import get_password_hash, verify_password
+from .search import UsernameIndex
+from .stats import ScoreHistogram
+from .timer_wheel import TimerWheel
 
 class Database:
     def __init__(self):
@@ -16,14 +24,47 @@ class Database:
             self.engine, expire_on_commit=False, class_=AsyncSession
         )
         
-        # Keep live games in memory for performance
-        self.live_games: List[LiveGame] = []
+        # Keep live games in memory for performance, keyed by game id.
+        # Sessions expire LIVE_GAME_TIMEOUT seconds after their last heartbeat.
+        self.live_games: Dict[str, LiveGame] = {}
+        self.session_expiry = TimerWheel(settings.LIVE_GAME_TICK, now=time.monotonic())
+        self._reaper_task: Optional[asyncio.Task] = None
+
+        # Username prefix index for player search, built by load_user_index()
+        self.user_index = UsernameIndex()
+
+        # Per-mode score distribution for percentiles, built by load_score_stats()
+        self.score_stats = self._empty_score_stats()
 
     async def init_db(self):
         async with self.engine.begin() as conn:
             # In a real production app, use Alembic for migrations
             await conn.run_sync(Base.metadata.create_all)
 
+    async def load_user_index(self):
+        async with self.async_session() as session:
+            users = await session.execute(select(UserDB.id, UserDB.username))
+            best_scores = await session.execute(
+                select(ScoreDB.user_id, ScoreDB.mode, func.max(ScoreDB.score))
+                .group_by(ScoreDB.user_id, ScoreDB.mode)
+            )
+            self.user_index = UsernameIndex.build(users.all(), best_scores.all())
+
+    @staticmethod
+    def _empty_score_stats() -> Dict[GameMode, ScoreHistogram]:
+        return {mode: ScoreHistogram(settings.SCORE_BUCKET_WIDTH) for mode in GameMode}
+
+    async def load_score_stats(self):
+        async with self.async_session() as session:
+            result = await session.execute(
+                select(ScoreDB.mode, ScoreDB.score, func.count())
+                .group_by(ScoreDB.mode, ScoreDB.score)
+            )
+            score_stats = self._empty_score_stats()
+            for mode, score, n in result:
+                score_stats[mode].add(score, n)
+            self.score_stats = score_stats
+
     # Auth methods
     async def get_user_by_email(self, email: str) -> Optional[User]:
         async with self.async_session() as session:
@@ -57,6 +98,7 @@ class Database:
             session.add(user_db)
             await session.commit()
             await session.refresh(user_db)
+            self.user_index.add_user(user_db.id, user_db.username)
             
             return User(
                 id=user_db.id,
@@ -91,7 +133,11 @@ class Database:
                 ))
             return leaderboard
 
-    async def submit_score(self, user: User, score: int, mode: GameMode) -> tuple[int, bool]:
+    async def get_score_stats(self, mode: Optional[GameMode] = None) -> List[ScoreStats]:
+        modes = [mode] if mode else list(GameMode)
+        return [self.score_stats[m].summary(m) for m in modes]
+
+    async def submit_score(self, user: User, score: int, mode: GameMode) -> tuple[int, bool, Optional[float]]:
         async with self.async_session() as session:
             # Check for existing high scores? simpler logic: just insert and calc rank
             
@@ -102,6 +148,9 @@ class Database:
             rank = count_res.scalar_one() + 1
             
             is_high_score = rank <= 10 # Top 10 is high score
+
+            # Compared against the other scores in this mode, from the in-memory histogram
+            percentile = self.score_stats[mode].percentile(score)
             
             # Always save the score
             score_db = ScoreDB(
@@ -111,22 +160,168 @@ class Database:
             )
             session.add(score_db)
             await session.commit()
+            self.user_index.record_score(user.id, mode, score)
+            self.score_stats[mode].add(score)
             
-            return rank, is_high_score
+            return rank, is_high_score, percentile
+
+    # Landing page
+    async def get_home(self, limit: int = 10) -> HomeResponse:
+        # AsyncSession cannot run statements concurrently, so rather than fanning
+        # out over several sessions the DB work is folded into one query: a UNION
+        # ALL of the per-mode top N (the overall top N is always contained in
+        # them). Live games are in memory.
+        branches = [
+            select(ScoreDB.id, ScoreDB.user_id, UserDB.username, ScoreDB.score, ScoreDB.mode, ScoreDB.date)
+            .join(UserDB, ScoreDB.user_id == UserDB.id)
+            .where(ScoreDB.mode == mode)
+            .order_by(desc(ScoreDB.score))
+            .limit(limit)
+            .subquery()
+            for mode in GameMode
+        ]
+        async with self.async_session() as session:
+            result = await session.execute(union_all(*[select(branch) for branch in branches]))
+            rows = sorted(result.all(), key=lambda r: r.score, reverse=True)
+
+        def entries(selected) -> List[LeaderboardEntry]:
+            return [
+                LeaderboardEntry(
+                    id=r.id,
+                    rank=i + 1,
+                    userId=r.user_id,
+                    username=r.username,
+                    score=r.score,
+                    mode=r.mode,
+                    date=r.date
+                )
+                for i, r in enumerate(selected[:limit])
+            ]
+
+        leaderboards = {"all": entries(rows)}
+        for mode in GameMode:
+            leaderboards[mode.value] = entries([r for r in rows if r.mode == mode])
+
+        return HomeResponse(
+            leaderboards=leaderboards,
+            liveGames=await self.get_live_games()
+        )
+
+    # Search methods
+    async def search_users(self, prefix: str, limit: int = 10) -> List[UserSearchResult]:
+        return self.user_index.search(prefix, limit)
+
+    # Export methods
+    async def stream_scores(
+        self,
+        mode: Optional[GameMode] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        # Server-side cursor: rows are fetched batch_size at a time, so memory
+        # stays flat regardless of table size. No ORDER BY to avoid a full sort.
+        query = (
+            select(ScoreDB.id, ScoreDB.user_id, UserDB.username, ScoreDB.score, ScoreDB.mode, ScoreDB.date)
+            .join(UserDB, ScoreDB.user_id == UserDB.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if mode:
+            query = query.where(ScoreDB.mode == mode)
+        if start:
+            query = query.where(ScoreDB.date >= start)
+        if end:
+            query = query.where(ScoreDB.date <= end)
+
+        async with self.async_session() as session:
+            result = await session.stream(query)
+            async for batch in result.partitions():
+                yield batch
 
     # Live games methods (In-Memory)
     async def get_live_games(self) -> List[LiveGame]:
-        return self.live_games
+        return list(self.live_games.values())
+
+    async def get_live_game(self, game_id: str) -> Optional[LiveGame]:
+        return self.live_games.get(game_id)
+
+    async def start_game(self, user: User, mode: GameMode) -> LiveGame:
+        game = LiveGame(
+            id=str(uuid.uuid4()),
+            playerId=user.id,
+            playerName=user.username,
+            currentScore=0,
+            mode=mode,
+            status="playing",
+            startedAt=datetime.utcnow(),
+            viewerCount=0
+        )
+        self.live_games[game.id] = game
+        self.session_expiry.schedule(game.id, time.monotonic() + settings.LIVE_GAME_TIMEOUT)
+        return game
+
+    async def heartbeat_game(self, game_id: str, current_score: int) -> Optional[LiveGame]:
+        game = self.live_games.get(game_id)
+        if not game or game.status != "playing":
+            return None
+        game.currentScore = current_score
+        self.session_expiry.schedule(game_id, time.monotonic() + settings.LIVE_GAME_TIMEOUT)
+        return game
+
+    async def finish_game(self, game_id: str, user: User, score: int) -> Optional[tuple[int, bool, Optional[float]]]:
+        game = self.live_games.get(game_id)
+        if not game or game.status != "playing":
+            return None
+
+        # Claim the session so neither a concurrent finish nor the reaper acts on it
+        # while the score is being saved; put it back if saving fails.
+        game.status = "finished"
+        self.session_expiry.cancel(game_id)
+        try:
+            result = await self.submit_score(user, score, game.mode)
+        except Exception:
+            game.status = "playing"
+            self.session_expiry.schedule(game_id, time.monotonic() + settings.LIVE_GAME_TIMEOUT)
+            raise
+
+        self.live_games.pop(game_id, None)
+        return result
+
+    def expire_live_games(self, now: Optional[float] = None) -> List[str]:
+        expired = self.session_expiry.advance(time.monotonic() if now is None else now)
+        for game_id in expired:
+            self.live_games.pop(game_id, None)
+        return expired
+
+    async def _reap_sessions(self) -> None:
+        while True:
+            await asyncio.sleep(settings.LIVE_GAME_TICK)
+            self.expire_live_games()
+
+    def start_session_reaper(self) -> None:
+        # Startup hooks can fire more than once; keep a single reaper running.
+        # The reference also stops the task from being garbage collected.
+        if self._reaper_task is not None and not self._reaper_task.done():
+            return
+        self._reaper_task = asyncio.create_task(self._reap_sessions())
+
+    async def stop_session_reaper(self) -> None:
+        if self._reaper_task is None:
+            return
+        self._reaper_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._reaper_task
+        self._reaper_task = None
 
     async def join_game(self, game_id: str) -> bool:
-        game = next((g for g in self.live_games if g.id == game_id), None)
+        game = self.live_games.get(game_id)
         if game:
             game.viewerCount += 1
             return True
         return False
 
     async def leave_game(self, game_id: str) -> None:
-        game = next((g for g in self.live_games if g.id == game_id), None)
+        game = self.live_games.get(game_id)
         if game:
             game.viewerCount = max(0, game.viewerCount - 1)
 
@@ -0,0 +1,35 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy.engine import Row
+
+# Encoders for the streaming score export. Each batch of rows from
+# Database.stream_scores becomes one chunk of the HTTP response body.
+
+EXPORT_FIELDS = ["id", "userId", "username", "score", "mode", "date"]
+
+
+def _values(row: Row) -> list:
+    score_id, user_id, username, score, mode, day = row
+    return [score_id, user_id, username, score, mode.value, day.isoformat() if day else None]
+
+
+async def ndjson_chunks(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(json.dumps(dict(zip(EXPORT_FIELDS, _values(row)))) + "\n" for row in batch)
+
+
+async def csv_chunks(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for batch in batches:
+        writer.writerows(_values(row) for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
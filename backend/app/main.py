@@ -1,26 +1,40 @@
 import os
-from fastapi import FastAPI, HTTPException, status, Query, Depends, Response, APIRouter
+import secrets
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, status, Query, Depends, Response, APIRouter, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from datetime import date
 from typing import List, Optional
 
 from .models import (
     User, LoginRequest, SignupRequest, AuthResponse,
     LeaderboardEntry, ScoreSubmission, ScoreResponse, GameMode,
-    LiveGame, JoinGameResponse
+    LiveGame, JoinGameResponse, SlowRequest, ExportFormat, UserSearchResult,
+    StartGameRequest, HeartbeatRequest, FinishGameRequest, ScoreStats, HomeResponse
 )
+from .config import settings
 from .database import db
+from .export import ndjson_chunks, csv_chunks
 from .init_db import seed_data
+from .profiling import profiler, ProfilingMiddleware, ProfiledRoute
 
 # Create API Router
-api_router = APIRouter()
+api_router = APIRouter(route_class=ProfiledRoute)
 
-@api_router.on_event("startup")
-async def startup_event():
+# App-level lifespan: router on_event hooks fire twice once the router is
+# included, which would repeat the full-table index and stats scans on every boot
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     await db.init_db()
     if os.getenv("SEED_DB") == "true":
         await seed_data()
+    await db.load_user_index()
+    await db.load_score_stats()
+    db.start_session_reaper()
+    yield
+    await db.stop_session_reaper()
 
 # Auth Routes
 @api_router.post("/auth/login", response_model=AuthResponse, tags=["Auth"])
@@ -54,6 +68,19 @@ async def get_current_user(email: str = Query(..., description="Simulated auth t
     # or just return null if not provided (though this endpoint requires it in this simple impl)
     return await db.get_user_by_email(email)
 
+# Landing page: leaderboards and live games in one request
+@api_router.get("/home", response_model=HomeResponse, tags=["Home"])
+async def get_home(limit: int = Query(10, ge=1, le=100)):
+    return await db.get_home(limit)
+
+# User Routes
+@api_router.get("/users/search", response_model=List[UserSearchResult], tags=["Users"])
+async def search_users(
+    q: str = Query(..., min_length=1, description="Username prefix (case-insensitive)"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    return await db.search_users(q, limit)
+
 # Leaderboard Routes
 @api_router.get("/leaderboard", response_model=List[LeaderboardEntry], tags=["Leaderboard"])
 async def get_leaderboard(
@@ -62,20 +89,59 @@ async def get_leaderboard(
 ):
     return await db.get_leaderboard(mode, limit)
 
+@api_router.get("/leaderboard/stats", response_model=List[ScoreStats], tags=["Leaderboard"])
+async def get_leaderboard_stats(mode: Optional[GameMode] = None):
+    return await db.get_score_stats(mode)
+
 @api_router.post("/leaderboard", response_model=ScoreResponse, tags=["Leaderboard"])
 async def submit_score(submission: ScoreSubmission, email: str = Query(..., description="User email (auth)")):
     user = await db.get_user_by_email(email)
     if not user:
         raise HTTPException(status_code=401, detail="Unauthorized")
         
-    rank, is_high_score = await db.submit_score(user, submission.score, submission.mode)
-    return ScoreResponse(rank=rank, isHighScore=is_high_score)
+    rank, is_high_score, percentile = await db.submit_score(user, submission.score, submission.mode)
+    return ScoreResponse(rank=rank, isHighScore=is_high_score, percentile=round(percentile, 1) if percentile is not None else None)
 
 # Spectator Routes
 @api_router.get("/games", response_model=List[LiveGame], tags=["Game"])
 async def get_live_games():
     return await db.get_live_games()
 
+@api_router.post("/games", response_model=LiveGame, status_code=status.HTTP_201_CREATED, tags=["Game"])
+async def start_game(request: StartGameRequest, email: str = Query(..., description="User email (auth)")):
+    user = await db.get_user_by_email(email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return await db.start_game(user, request.mode)
+
+async def get_own_game(game_id: str, email: str) -> tuple[User, LiveGame]:
+    user = await db.get_user_by_email(email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    game = await db.get_live_game(game_id)
+    if not game or game.playerId != user.id:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return user, game
+
+@api_router.post("/games/{game_id}/heartbeat", response_model=LiveGame, tags=["Game"])
+async def heartbeat_game(game_id: str, request: HeartbeatRequest, email: str = Query(..., description="User email (auth)")):
+    await get_own_game(game_id, email)
+    game = await db.heartbeat_game(game_id, request.currentScore)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return game
+
+@api_router.post("/games/{game_id}/finish", response_model=ScoreResponse, tags=["Game"])
+async def finish_game(game_id: str, request: FinishGameRequest, email: str = Query(..., description="User email (auth)")):
+    user, game = await get_own_game(game_id, email)
+    score = request.score if request.score is not None else game.currentScore
+    result = await db.finish_game(game_id, user, score)
+    # Already finished or reaped by the time we got here
+    if result is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    rank, is_high_score, percentile = result
+    return ScoreResponse(rank=rank, isHighScore=is_high_score, percentile=round(percentile, 1) if percentile is not None else None)
+
 @api_router.post("/games/{game_id}/join", response_model=JoinGameResponse, tags=["Game"])
 async def join_game(game_id: str):
     success = await db.join_game(game_id)
@@ -88,11 +154,47 @@ async def leave_game(game_id: str):
     await db.leave_game(game_id)
     return {"message": "Successfully left game"}
 
+# Admin Routes
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # Admin endpoints are disabled entirely unless ADMIN_TOKEN is configured
+    if not settings.ADMIN_TOKEN or not secrets.compare_digest(x_admin_token or "", settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+@api_router.get("/admin/profiles", response_class=PlainTextResponse, tags=["Admin"], dependencies=[Depends(require_admin)])
+async def download_profiles():
+    # Collapsed stacks, ready for flamegraph.pl or speedscope
+    return PlainTextResponse(
+        profiler.collapsed_stacks(),
+        headers={"Content-Disposition": 'attachment; filename="profiles.folded"'}
+    )
+
+@api_router.get("/admin/slow-requests", response_model=List[SlowRequest], tags=["Admin"], dependencies=[Depends(require_admin)])
+async def get_slow_requests():
+    return profiler.slow_request_summaries()
+
+# Export Routes
+@api_router.get("/export/scores", tags=["Export"], dependencies=[Depends(require_admin)])
+async def export_scores(
+    format: ExportFormat = ExportFormat.ndjson,
+    mode: Optional[GameMode] = None,
+    start: Optional[date] = Query(None, description="First day to include (inclusive)"),
+    end: Optional[date] = Query(None, description="Last day to include (inclusive)")
+):
+    batches = db.stream_scores(mode, start, end)
+    if format == ExportFormat.csv:
+        return StreamingResponse(
+            csv_chunks(batches),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="scores.csv"'}
+        )
+    return StreamingResponse(ndjson_chunks(batches), media_type="application/x-ndjson")
+
 # Main App
 app = FastAPI(
     title="Snake Arena API",
     description="Backend API for the Snake Arena multiplayer game",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Middleware
@@ -104,6 +206,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sampling profiler (no-op unless PROFILING_ENABLED=true)
+app.add_middleware(ProfilingMiddleware)
+
 # Include API Router
 app.include_router(api_router, prefix="/api")
 
@@ -1,12 +1,16 @@
 from enum import Enum
 from pydantic import BaseModel, EmailStr, Field
 from datetime import date, datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 class GameMode(str, Enum):
     walls = "walls"
     pass_through = "pass-through"
 
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
 class User(BaseModel):
     id: str
     username: str
@@ -23,6 +27,11 @@ class LeaderboardEntry(BaseModel):
     mode: GameMode
     date: date
 
+class UserSearchResult(BaseModel):
+    id: str
+    username: str
+    bestScores: Dict[GameMode, int]
+
 class LiveGame(BaseModel):
     id: str
     playerId: str
@@ -33,6 +42,16 @@ class LiveGame(BaseModel):
     startedAt: datetime
     viewerCount: int
 
+class StartGameRequest(BaseModel):
+    mode: GameMode
+
+class HeartbeatRequest(BaseModel):
+    currentScore: int
+
+class FinishGameRequest(BaseModel):
+    # Defaults to the score from the last heartbeat
+    score: Optional[int] = None
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
@@ -54,7 +73,33 @@ class ScoreSubmission(BaseModel):
 class ScoreResponse(BaseModel):
     rank: int
     isHighScore: bool
+    # Share of earlier scores in the same mode that this score beats; None for the first score in a mode
+    percentile: Optional[float] = None
+
+class ScoreStats(BaseModel):
+    mode: GameMode
+    count: int
+    min: Optional[int] = None
+    max: Optional[int] = None
+    mean: Optional[float] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
 
 class JoinGameResponse(BaseModel):
     success: bool
     error: Optional[str] = None
+
+class SlowRequest(BaseModel):
+    method: str
+    path: str
+    startedAt: datetime
+    durationMs: float
+    phases: Dict[str, float]
+    samples: int
+    blockedSamples: int
+
+class HomeResponse(BaseModel):
+    # Keyed by "all" and by each GameMode value
+    leaderboards: Dict[str, List[LeaderboardEntry]]
+    liveGames: List[LiveGame]
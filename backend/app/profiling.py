@@ -0,0 +1,302 @@
+import asyncio
+import functools
+import inspect
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+
+from .config import settings
+
+# Profiling is opt-in (PROFILING_ENABLED=true). A fraction of requests is sampled;
+# each sampled request gets a per-phase breakdown (Server-Timing header), and the
+# ones slower than PROFILING_SLOW_MS keep their stack samples in a ring buffer
+# that can be downloaded as collapsed stacks from /api/admin/profiles.
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.total_time = 0.0
+        self.pool_time = 0.0      # time spent waiting for a pooled connection
+        self.db_time = 0.0        # time spent executing SQL
+        self.endpoint_time = 0.0  # time spent inside the route function (includes pool_time and db_time)
+        self.route_time = 0.0     # endpoint + request validation + response serialization
+        self.stacks: Counter = Counter()          # samples taken while this request's task was running
+        self.blocked_stacks: Counter = Counter()  # samples of other work holding the loop meanwhile
+
+    def phases(self) -> Dict[str, float]:
+        """Phase breakdown in milliseconds."""
+        return {
+            "handler": max(self.endpoint_time - self.db_time - self.pool_time, 0.0) * 1000,
+            "pool": self.pool_time * 1000,
+            "db": self.db_time * 1000,
+            "serialization": max(self.route_time - self.endpoint_time, 0.0) * 1000,
+        }
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{name};dur={ms:.2f}" for name, ms in self.phases().items())
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+# SQL timing. Registered on the Engine class so it covers every engine, including
+# the ones the tests swap in. The async driver runs these hooks inside a greenlet
+# that shares the request's context, so the contextvar is visible here. The start
+# time lives on the per-statement execution context, so a failing statement
+# leaves nothing behind on the pooled connection.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_profile.get() is not None:
+        context._profile_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    start = getattr(context, "_profile_start", None)
+    if profile is not None and start is not None:
+        profile.db_time += time.perf_counter() - start
+
+
+# Pool waits. The pool has no "before checkout" hook, so stamp the session right
+# before any statement or flush; if that needs a new connection, after_begin fires
+# once the connection is checked out and the gap is the pool wait.
+@event.listens_for(Session, "do_orm_execute")
+def _stamp_execute(orm_execute_state):
+    if _current_profile.get() is not None:
+        orm_execute_state.session.info["profile_checkout_start"] = time.perf_counter()
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_flush(session, flush_context, instances):
+    if _current_profile.get() is not None:
+        session.info["profile_checkout_start"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_begin")
+def _after_begin(session, transaction, connection):
+    profile = _current_profile.get()
+    start = session.info.pop("profile_checkout_start", None)
+    if profile is not None and start is not None:
+        profile.pool_time += time.perf_counter() - start
+
+
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """
+    Background thread that periodically samples the event loops serving profiled requests.
+
+    All requests share the loop's thread, so a thread's stack alone says nothing
+    about which request it belongs to. Each sample is attributed through the task
+    currently running on the loop: if that task carries a sampled request's
+    context, the stack goes to that request; any other work holding the loop is
+    recorded as blocking every sampled request waiting on it. Samples taken while
+    no task runs (the loop is idle in select) are dropped.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: Dict[RequestProfile, Tuple[int, asyncio.AbstractEventLoop]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: RequestProfile, thread_id: int, loop: asyncio.AbstractEventLoop) -> None:
+        with self._lock:
+            self._active[profile] = (thread_id, loop)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            self._wake.set()
+
+    def remove(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.pop(profile, None)
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        by_loop: Dict[Tuple[int, asyncio.AbstractEventLoop], List[RequestProfile]] = {}
+        for profile, key in self._active.items():
+            by_loop.setdefault(key, []).append(profile)
+
+        for (thread_id, loop), profiles in by_loop.items():
+            task = asyncio.current_task(loop)
+            frame = frames.get(thread_id)
+            if task is None or frame is None:
+                continue
+            owner = task.get_context().get(_current_profile)
+            stack = _collapse(frame)
+            for profile in profiles:
+                if profile is owner:
+                    profile.stacks[stack] += 1
+                else:
+                    profile.blocked_stacks[stack] += 1
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if not self._active:
+                    # Sleep until the next sampled request instead of spinning
+                    self._wake.clear()
+                    continue
+                self._sample()
+            time.sleep(self.interval)
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = settings.PROFILING_ENABLED
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.slow_ms = settings.PROFILING_SLOW_MS
+        self.slow_requests: deque = deque(maxlen=settings.PROFILING_BUFFER_SIZE)
+        self.sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000)
+
+    def should_sample(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def begin(self, method: str, path: str) -> RequestProfile:
+        profile = RequestProfile(method, path)
+        self.sampler.add(profile, threading.get_ident(), asyncio.get_running_loop())
+        return profile
+
+    def finish(self, profile: RequestProfile) -> None:
+        self.sampler.remove(profile)
+        profile.total_time = time.perf_counter() - profile.start
+        if profile.total_time * 1000 >= self.slow_ms:
+            self.slow_requests.append(profile)
+
+    def slow_request_summaries(self) -> List[dict]:
+        return [
+            {
+                "method": p.method,
+                "path": p.path,
+                "startedAt": p.started_at,
+                "durationMs": p.total_time * 1000,
+                "phases": p.phases(),
+                "samples": sum(p.stacks.values()),
+                "blockedSamples": sum(p.blocked_stacks.values()),
+            }
+            for p in list(self.slow_requests)
+        ]
+
+    def collapsed_stacks(self) -> str:
+        """
+        All buffered slow-request samples in collapsed-stack format (flamegraph.pl / speedscope).
+
+        A request's own samples are rooted at "METHOD path"; work from other tasks
+        that held the event loop while it was in flight is rooted separately at
+        "(loop blocked) METHOD path".
+        """
+        merged: Counter = Counter()
+        for p in list(self.slow_requests):
+            root = f"{p.method} {p.path}"
+            for stack, count in p.stacks.items():
+                merged[f"{root};{stack}"] += count
+            for stack, count in p.blocked_stacks.items():
+                merged[f"(loop blocked) {root};{stack}"] += count
+        return "".join(f"{stack} {count}\n" for stack, count in merged.items())
+
+    def clear(self) -> None:
+        self.slow_requests.clear()
+
+
+profiler = Profiler()
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware so unsampled requests pay only for a random() call."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        profile = profiler.begin(scope["method"], scope["path"])
+        token = _current_profile.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_profile.reset(token)
+            profiler.finish(profile)
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            profile = _current_profile.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.endpoint_time += time.perf_counter() - start
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profile.endpoint_time += time.perf_counter() - start
+    return sync_wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute that times the endpoint separately from validation/serialization."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            profile = _current_profile.get()
+            if profile is None:
+                return await handler(request)
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                profile.route_time += time.perf_counter() - start
+
+        return profiled_handler
@@ -0,0 +1,53 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple
+
+from .models import GameMode, UserSearchResult
+
+
+class UsernameIndex:
+    """
+    In-memory, case-insensitive username prefix index.
+
+    Entries are kept in a list sorted by casefolded username, so a prefix lookup is
+    one bisect plus a scan over the matches. Best scores per mode are kept alongside
+    so search results need no database round-trip.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, str, str]] = []  # (folded username, user id, username)
+        self._best: Dict[str, Dict[GameMode, int]] = {}
+
+    @classmethod
+    def build(cls, users: Iterable[Tuple[str, str]], best_scores: Iterable[Tuple[str, GameMode, int]]) -> "UsernameIndex":
+        index = cls()
+        index._entries = sorted((username.casefold(), user_id, username) for user_id, username in users)
+        for user_id, mode, score in best_scores:
+            index.record_score(user_id, mode, score)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add_user(self, user_id: str, username: str) -> None:
+        insort(self._entries, (username.casefold(), user_id, username))
+
+    def record_score(self, user_id: str, mode: GameMode, score: int) -> None:
+        best = self._best.setdefault(user_id, {})
+        if mode not in best or score > best[mode]:
+            best[mode] = score
+
+    def search(self, prefix: str, limit: int = 10) -> List[UserSearchResult]:
+        prefix = prefix.casefold()
+        results = []
+        i = bisect_left(self._entries, (prefix,))
+        while i < len(self._entries) and len(results) < limit:
+            folded, user_id, username = self._entries[i]
+            if not folded.startswith(prefix):
+                break
+            results.append(UserSearchResult(
+                id=user_id,
+                username=username,
+                bestScores=dict(self._best.get(user_id, {}))
+            ))
+            i += 1
+        return results
@@ -0,0 +1,105 @@
+from typing import Optional
+
+from .models import GameMode, ScoreStats
+
+# Number of histogram buckets per mode. The last one is an overflow bucket that
+# holds every score from bucket_width * (MAX_BUCKETS - 1) upwards.
+MAX_BUCKETS = 1 << 14
+OVERFLOW_BUCKET = MAX_BUCKETS - 1
+
+
+class ScoreHistogram:
+    """
+    Fixed-width score histogram stored as a Fenwick tree.
+
+    Adding a score and answering "how many scores are below x" or "what is the
+    q-quantile" cost O(log MAX_BUCKETS), independent of how many scores exist.
+    Values inside a bucket are interpolated assuming a uniform spread. The
+    overflow bucket has no fixed upper edge, so quantiles that land in it are
+    answered with the largest recorded score rather than an interpolated value.
+    Negative scores are counted as 0.
+    """
+
+    def __init__(self, bucket_width: int):
+        self.bucket_width = bucket_width
+        self._tree = [0] * (MAX_BUCKETS + 1)
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def _bucket(self, score: int) -> int:
+        return min(max(score, 0) // self.bucket_width, OVERFLOW_BUCKET)
+
+    def _prefix(self, bucket: int) -> int:
+        """Number of scores in buckets [0, bucket)."""
+        n = 0
+        while bucket > 0:
+            n += self._tree[bucket]
+            bucket -= bucket & -bucket
+        return n
+
+    def add(self, score: int, n: int = 1) -> None:
+        score = max(score, 0)
+        i = self._bucket(score) + 1
+        while i <= MAX_BUCKETS:
+            self._tree[i] += n
+            i += i & -i
+        self.count += n
+        self.total += score * n
+        self.min = score if self.min is None else min(self.min, score)
+        self.max = score if self.max is None else max(self.max, score)
+
+    def count_below(self, score: int) -> float:
+        if self.max is not None and score > self.max:
+            return float(self.count)
+        bucket = self._bucket(score)
+        below = self._prefix(bucket)
+        in_bucket = self._prefix(bucket + 1) - below
+        lower = bucket * self.bucket_width
+        if bucket == OVERFLOW_BUCKET:
+            # Spread the overflow bucket between its lower edge and the largest score
+            fraction = (score - lower) / (self.max - lower) if self.max > lower else 0.0
+        else:
+            fraction = (max(score, 0) - lower) / self.bucket_width
+        return below + in_bucket * min(fraction, 1.0)
+
+    def percentile(self, score: int) -> Optional[float]:
+        """Percentage of recorded scores lower than `score`; None when there are none to compare with."""
+        if self.count == 0:
+            return None
+        return 100.0 * self.count_below(score) / self.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        target = q * self.count
+        # Fenwick descent: find the first bucket whose cumulative count reaches target
+        bucket, seen = 0, 0
+        step = MAX_BUCKETS
+        while step:
+            nxt = bucket + step
+            if nxt <= MAX_BUCKETS and seen + self._tree[nxt] < target:
+                bucket = nxt
+                seen += self._tree[nxt]
+            step >>= 1
+        if bucket == OVERFLOW_BUCKET:
+            return float(self.max)
+        in_bucket = self._prefix(bucket + 1) - seen
+        value = bucket * self.bucket_width
+        if in_bucket:
+            value += self.bucket_width * (target - seen) / in_bucket
+        return float(min(max(value, self.min), self.max))
+
+    def summary(self, mode: GameMode) -> ScoreStats:
+        return ScoreStats(
+            mode=mode,
+            count=self.count,
+            min=self.min,
+            max=self.max,
+            mean=self.total / self.count if self.count else None,
+            p50=self.quantile(0.5),
+            p90=self.quantile(0.9),
+            p99=self.quantile(0.99)
+        )
+
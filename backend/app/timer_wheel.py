@@ -0,0 +1,61 @@
+import math
+from typing import Dict, List, Set
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel for expiring keys.
+
+    Time is divided into ticks of `tick` seconds and each deadline is hashed into
+    slot (deadline_tick % slots). Scheduling, rescheduling and cancelling are O(1);
+    advancing the clock only visits the slots for the ticks that elapsed, so the
+    cost per tick is proportional to the keys in that slot, not to all keys.
+    Deadlines further out than one revolution simply stay in their slot until the
+    revolution in which they are due.
+    """
+
+    def __init__(self, tick: float, slots: int = 512, now: float = 0.0):
+        self.tick = tick
+        self._slots: List[Set[str]] = [set() for _ in range(slots)]
+        self._deadline_ticks: Dict[str, int] = {}
+        self._current_tick = self._tick_of(now)
+
+    def _tick_of(self, t: float) -> int:
+        return math.floor(t / self.tick)
+
+    def __len__(self) -> int:
+        return len(self._deadline_ticks)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._deadline_ticks
+
+    def schedule(self, key: str, deadline: float) -> None:
+        """Schedule (or reschedule) `key` to expire at `deadline`."""
+        self.cancel(key)
+        # Round up so a key never expires before its deadline
+        deadline_tick = max(math.ceil(deadline / self.tick), self._current_tick + 1)
+        self._deadline_ticks[key] = deadline_tick
+        self._slots[deadline_tick % len(self._slots)].add(key)
+
+    def cancel(self, key: str) -> None:
+        deadline_tick = self._deadline_ticks.pop(key, None)
+        if deadline_tick is not None:
+            self._slots[deadline_tick % len(self._slots)].discard(key)
+
+    def advance(self, now: float) -> List[str]:
+        """Move the wheel forward to `now` and return the keys that expired."""
+        now_tick = self._tick_of(now)
+        if now_tick <= self._current_tick:
+            return []
+
+        # After a long pause every slot is due at most once
+        first_tick = max(self._current_tick + 1, now_tick - len(self._slots) + 1)
+        expired = []
+        for t in range(first_tick, now_tick + 1):
+            slot = self._slots[t % len(self._slots)]
+            for key in [k for k in slot if self._deadline_ticks[k] <= now_tick]:
+                slot.discard(key)
+                del self._deadline_ticks[key]
+                expired.append(key)
+        self._current_tick = now_tick
+        return expired
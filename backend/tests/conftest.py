@@ -6,6 +6,7 @@ from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from datetime import datetime, date
 import uuid
+import time
 
 # Add app to path if needed, but usually works if run from root or backend
 import sys
@@ -17,6 +18,8 @@ from app.database import db
 from app.db_models import Base, UserDB, ScoreDB
 from app.models import GameMode, LiveGame
 from app.security import get_password_hash
+from app.config import settings
+from app.timer_wheel import TimerWheel
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -33,7 +36,8 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     db.async_session = async_session
     
     # Reset in-memory live games
-    db.live_games = []
+    db.live_games = {}
+    db.session_expiry = TimerWheel(settings.LIVE_GAME_TICK, now=time.monotonic())
     
     async with async_session() as session:
         yield session
@@ -76,10 +80,12 @@ async def seed_db_data(db_session):
     db_session.add(ScoreDB(id=str(uuid.uuid4()), user_id=user3.id, score=50, mode=GameMode.walls, date=date.today()))
     
     await db_session.commit()
+    await db.load_user_index()
+    await db.load_score_stats()
     
     # 3. Live Game (test_get_live_games expects game1)
-    # We manipulate the in-memory list on the global db object
-    db.live_games.append(LiveGame(
+    # We manipulate the in-memory dict on the global db object
+    db.live_games["game1"] = LiveGame(
         id="game1",
         playerId=demo_user.id,
         playerName="DemoPlayer",
@@ -88,4 +94,4 @@ async def seed_db_data(db_session):
         status="playing",
         startedAt=datetime.utcnow(),
         viewerCount=0
-    ))
+    )
@@ -85,3 +85,251 @@ async def test_join_game(client: AsyncClient):
     # Verify count increased
     response = await client.get("/api/games")
     assert response.json()[0]["viewerCount"] == initial_count + 1
+
+@pytest.mark.asyncio
+async def test_profiling_captures_slow_requests(client: AsyncClient, monkeypatch):
+    from app.config import settings
+    from app.profiling import profiler
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiler, "enabled", True)
+    monkeypatch.setattr(profiler, "sample_rate", 1.0)
+    monkeypatch.setattr(profiler, "slow_ms", 0.0)
+    profiler.clear()
+
+    response = await client.get("/api/leaderboard")
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    for phase in ("handler", "pool", "db", "serialization"):
+        assert f"{phase};dur=" in timing
+
+    # Admin endpoints require the token
+    response = await client.get("/api/admin/slow-requests")
+    assert response.status_code == 403
+
+    response = await client.get("/api/admin/slow-requests", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data[0]["path"] == "/api/leaderboard"
+    assert data[0]["phases"]["db"] > 0
+
+    response = await client.get("/api/admin/profiles", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    for line in response.text.splitlines():
+        assert line.startswith("GET ") or line.startswith("(loop blocked) GET ")
+        assert line.rsplit(" ", 1)[1].isdigit()
+    profiler.clear()
+
+@pytest.mark.asyncio
+async def test_profiling_attributes_samples_to_running_request(client: AsyncClient, monkeypatch):
+    import asyncio
+    from app.profiling import profiler
+
+    monkeypatch.setattr(profiler, "enabled", True)
+    monkeypatch.setattr(profiler, "sample_rate", 1.0)
+    monkeypatch.setattr(profiler, "slow_ms", 0.0)
+    monkeypatch.setattr(profiler.sampler, "interval", 0.001)
+    profiler.clear()
+
+    # bcrypt in the login blocks the shared event loop while the leaderboard requests are in flight
+    await asyncio.gather(
+        client.post("/api/auth/login", json={"email": "demo@snake.io", "password": "demo"}),
+        *[client.get("/api/leaderboard") for _ in range(3)]
+    )
+
+    profiles = {p.method: [] for p in profiler.slow_requests}
+    for p in profiler.slow_requests:
+        profiles[p.method].append(p)
+    [login] = profiles["POST"]
+    assert len(profiles["GET"]) == 3
+
+    assert any("verify_password" in stack for stack in login.stacks)
+    for p in profiles["GET"]:
+        assert not any("verify_password" in stack for stack in p.stacks)
+
+    for line in profiler.collapsed_stacks().splitlines():
+        if "verify_password" in line:
+            assert line.startswith("POST /api/auth/login;") or line.startswith("(loop blocked) GET /api/leaderboard;")
+    profiler.clear()
+
+@pytest.mark.asyncio
+async def test_export_scores(client: AsyncClient, monkeypatch):
+    import json
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+
+    response = await client.get("/api/export/scores")
+    assert response.status_code == 403
+
+    response = await client.get("/api/export/scores", params={"mode": "walls"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(r["score"] for r in rows) == [50, 100, 200]
+    assert {r["username"] for r in rows} == {"DemoPlayer", "Viper", "Python"}
+
+    response = await client.get("/api/export/scores", params={"format": "csv"}, headers=headers)
+    lines = response.text.splitlines()
+    assert lines[0] == "id,userId,username,score,mode,date"
+    assert len(lines) == 4
+
+    # Date range in the past excludes everything
+    response = await client.get("/api/export/scores", params={"format": "csv", "end": "2000-01-01"}, headers=headers)
+    assert response.text.splitlines() == ["id,userId,username,score,mode,date"]
+
+@pytest.mark.asyncio
+async def test_search_users(client: AsyncClient):
+    await client.post("/api/auth/signup", json={"username": "Pythonista", "email": "pythonista@snake.io", "password": "pass"})
+    await client.post("/api/leaderboard", params={"email": "demo@snake.io"}, json={"score": 40, "mode": "pass-through"})
+
+    response = await client.get("/api/users/search", params={"q": "py"})
+    assert response.status_code == 200
+    data = response.json()
+    assert [u["username"] for u in data] == ["Python", "Pythonista"]
+    assert data[0]["bestScores"] == {"walls": 50}
+    assert data[1]["bestScores"] == {}
+
+    response = await client.get("/api/users/search", params={"q": "DEMO"})
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["bestScores"] == {"walls": 100, "pass-through": 40}
+
+    response = await client.get("/api/users/search", params={"q": "zzz"})
+    assert response.json() == []
+
+@pytest.mark.asyncio
+async def test_live_game_session(client: AsyncClient):
+    response = await client.post("/api/games", params={"email": "demo@snake.io"}, json={"mode": "walls"})
+    assert response.status_code == 201
+    game_id = response.json()["id"]
+
+    response = await client.post(f"/api/games/{game_id}/heartbeat", params={"email": "demo@snake.io"}, json={"currentScore": 120})
+    assert response.status_code == 200
+    assert response.json()["currentScore"] == 120
+
+    # Only the player can update their own session
+    response = await client.post(f"/api/games/{game_id}/heartbeat", params={"email": "viper@snake.io"}, json={"currentScore": 1})
+    assert response.status_code == 404
+
+    # Finishing without a score submits the last heartbeat score
+    response = await client.post(f"/api/games/{game_id}/finish", params={"email": "demo@snake.io"}, json={})
+    assert response.status_code == 200
+    assert response.json()["rank"] == 2
+
+    # A session can only be finished once
+    response = await client.post(f"/api/games/{game_id}/finish", params={"email": "demo@snake.io"}, json={})
+    assert response.status_code == 404
+
+    response = await client.get("/api/games")
+    assert [g["id"] for g in response.json()] == ["game1"]
+
+@pytest.mark.asyncio
+async def test_live_game_expiry(client: AsyncClient):
+    import time
+    from app.config import settings
+    from app.database import db
+
+    response = await client.post("/api/games", params={"email": "demo@snake.io"}, json={"mode": "walls"})
+    game_id = response.json()["id"]
+
+    now = time.monotonic()
+    assert db.expire_live_games(now + settings.LIVE_GAME_TIMEOUT / 2) == []
+    assert db.expire_live_games(now + settings.LIVE_GAME_TIMEOUT + settings.LIVE_GAME_TICK * 2) == [game_id]
+    assert game_id not in db.live_games
+    assert "game1" in db.live_games
+
+@pytest.mark.asyncio
+async def test_session_reaper_starts_once(client: AsyncClient):
+    from app.database import db
+
+    db.start_session_reaper()
+    task = db._reaper_task
+    db.start_session_reaper()
+    assert db._reaper_task is task
+
+    await db.stop_session_reaper()
+    assert task.cancelled()
+    assert db._reaper_task is None
+
+@pytest.mark.asyncio
+async def test_score_percentile_and_stats(client: AsyncClient):
+    response = await client.post("/api/leaderboard", params={"email": "demo@snake.io"}, json={"score": 150, "mode": "walls"})
+    assert response.json()["percentile"] == pytest.approx(66.7)
+
+    # First score in a mode has nobody to beat
+    response = await client.post("/api/leaderboard", params={"email": "demo@snake.io"}, json={"score": 10, "mode": "pass-through"})
+    assert response.json()["percentile"] is None
+
+    response = await client.post("/api/leaderboard", params={"email": "demo@snake.io"}, json={"score": 20, "mode": "pass-through"})
+    assert response.json()["percentile"] == 100.0
+
+    response = await client.get("/api/leaderboard/stats", params={"mode": "walls"})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["count"] == 4
+    assert data[0]["min"] == 50 and data[0]["max"] == 200
+    assert data[0]["mean"] == pytest.approx(125)
+    assert 100 <= data[0]["p50"] <= 150
+    assert data[0]["p99"] <= 200
+
+    response = await client.get("/api/leaderboard/stats")
+    assert [s["mode"] for s in response.json()] == ["walls", "pass-through"]
+
+@pytest.mark.asyncio
+async def test_score_stats_outliers(client: AsyncClient):
+    # Far beyond the histogram's fixed-width range: quantiles must not invent a value
+    response = await client.post("/api/leaderboard", params={"email": "demo@snake.io"}, json={"score": 1_000_000_000, "mode": "walls"})
+    assert response.json()["percentile"] == 100.0
+
+    response = await client.get("/api/leaderboard/stats", params={"mode": "walls"})
+    stats = response.json()[0]
+    assert stats["p90"] == 1_000_000_000
+    assert stats["p99"] == 1_000_000_000
+    assert stats["p50"] <= 200
+
+    response = await client.post("/api/leaderboard", params={"email": "demo@snake.io"}, json={"score": 500_000_000, "mode": "walls"})
+    assert 75 <= response.json()["percentile"] < 100
+
+    # Negative scores are counted as 0 everywhere
+    await client.post("/api/leaderboard", params={"email": "demo@snake.io"}, json={"score": -5, "mode": "pass-through"})
+    response = await client.get("/api/leaderboard/stats", params={"mode": "pass-through"})
+    stats = response.json()[0]
+    assert stats["min"] == 0 and stats["mean"] == 0 and stats["p50"] == 0
+
+@pytest.mark.asyncio
+async def test_home(client: AsyncClient):
+    await client.post("/api/leaderboard", params={"email": "demo@snake.io"}, json={"score": 75, "mode": "pass-through"})
+
+    response = await client.get("/api/home", params={"limit": 3})
+    assert response.status_code == 200
+    data = response.json()
+    assert [g["id"] for g in data["liveGames"]] == ["game1"]
+
+    boards = data["leaderboards"]
+    assert [e["score"] for e in boards["all"]] == [200, 100, 75]
+    assert [e["score"] for e in boards["walls"]] == [200, 100, 50]
+    assert [e["score"] for e in boards["pass-through"]] == [75]
+    assert boards["all"][0]["rank"] == 1 and boards["all"][0]["username"] == "Viper"
+
+@pytest.mark.asyncio
+async def test_startup_runs_once(client: AsyncClient, monkeypatch):
+    from app.main import app
+    from app.database import db
+
+    calls = {"init_db": 0, "load_user_index": 0, "load_score_stats": 0}
+
+    def counter(name):
+        async def count():
+            calls[name] += 1
+        return count
+
+    for name in calls:
+        monkeypatch.setattr(db, name, counter(name))
+
+    async with app.router.lifespan_context(app):
+        assert db._reaper_task is not None
+    assert calls == {"init_db": 1, "load_user_index": 1, "load_score_stats": 1}
+    assert db._reaper_task is None
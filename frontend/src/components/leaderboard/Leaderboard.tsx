@@ -4,25 +4,46 @@ import type { LeaderboardEntry, GameMode } from '@/types/game';
 import { Button } from '@/components/ui/button';
 import { Trophy, Loader2 } from 'lucide-react';
 
-export function Leaderboard() {
+interface LeaderboardProps {
+  // Entries for every filter, already fetched by the page (see homeApi); shown
+  // until the fresh list for the selected filter arrives
+  preloaded?: Record<GameMode | 'all', LeaderboardEntry[]>;
+}
+
+export function Leaderboard({ preloaded }: LeaderboardProps) {
   const [entries, setEntries] = useState<LeaderboardEntry[]>([]);
   const [loading, setLoading] = useState(true);
   const [filter, setFilter] = useState<GameMode | 'all'>('all');
 
   useEffect(() => {
+    let cancelled = false;
+
     const fetchLeaderboard = async () => {
       setLoading(true);
       const data = await leaderboardApi.getLeaderboard(
         filter === 'all' ? undefined : filter,
         10
       );
+      if (cancelled) return;
       setEntries(data);
       setLoading(false);
     };
     
     fetchLeaderboard();
+    return () => {
+      cancelled = true;
+    };
   }, [filter]);
 
+  // Fill in from the page's data while the fetch above is in flight
+  useEffect(() => {
+    const cached = preloaded?.[filter];
+    if (loading && cached) {
+      setEntries(cached);
+      setLoading(false);
+    }
+  }, [filter, preloaded, loading]);
+
   return (
     <div className="w-full max-w-md mx-auto">
       <div className="flex items-center justify-between mb-4">
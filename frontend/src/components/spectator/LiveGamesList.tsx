@@ -6,11 +6,13 @@ import { Eye, Users, Loader2 } from 'lucide-react';
 
 interface LiveGamesListProps {
   onSelectGame: (gameId: string) => void;
+  // Games already fetched by the page (see homeApi); shown until the first refresh lands
+  initialGames?: LiveGame[];
 }
 
-export function LiveGamesList({ onSelectGame }: LiveGamesListProps) {
-  const [games, setGames] = useState<LiveGame[]>([]);
-  const [loading, setLoading] = useState(true);
+export function LiveGamesList({ onSelectGame, initialGames }: LiveGamesListProps) {
+  const [games, setGames] = useState<LiveGame[]>(initialGames ?? []);
+  const [loading, setLoading] = useState(!initialGames);
 
   useEffect(() => {
     const fetchGames = async () => {
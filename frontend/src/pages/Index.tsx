@@ -1,17 +1,24 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { SnakeGame } from '@/components/game/SnakeGame';
 import { Leaderboard } from '@/components/leaderboard/Leaderboard';
 import { LiveGamesList } from '@/components/spectator/LiveGamesList';
 import { SpectatorView } from '@/components/spectator/SpectatorView';
 import { Header } from '@/components/layout/Header';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
-import { spectatorApi } from '@/services/api';
-import type { LiveGame } from '@/types/game';
+import { homeApi, spectatorApi } from '@/services/api';
+import type { HomeData, LiveGame } from '@/types/game';
 import { Gamepad2, Trophy, Eye } from 'lucide-react';
 
 export default function Index() {
   const [activeTab, setActiveTab] = useState('play');
   const [spectatingGame, setSpectatingGame] = useState<LiveGame | null>(null);
+  const [home, setHome] = useState<HomeData | null>(null);
+
+  // One request on page load for every leaderboard and the live games. The tabs
+  // show it straight away and refresh their own data in the background.
+  useEffect(() => {
+    homeApi.get().then(setHome);
+  }, []);
 
   const handleSelectGame = async (gameId: string) => {
     const games = await spectatorApi.getLiveGames();
@@ -67,12 +74,12 @@ export default function Index() {
           </TabsContent>
           
           <TabsContent value="leaderboard">
-            <Leaderboard />
+            <Leaderboard preloaded={home?.leaderboards} />
           </TabsContent>
           
           <TabsContent value="watch">
             <div className="max-w-md mx-auto">
-              <LiveGamesList onSelectGame={handleSelectGame} />
+              <LiveGamesList onSelectGame={handleSelectGame} initialGames={home?.liveGames} />
             </div>
           </TabsContent>
         </Tabs>
@@ -1,5 +1,5 @@
 import { describe, it, expect, beforeEach, vi, afterEach } from 'vitest';
-import { authApi, leaderboardApi, spectatorApi, aiPlayerApi } from '@/services/api';
+import { authApi, leaderboardApi, homeApi, spectatorApi, aiPlayerApi } from '@/services/api';
 import type { GameState } from '@/types/game';
 
 // Helper to mock fetch responses
@@ -159,6 +159,55 @@ describe('leaderboardApi', () => {
   });
 });
 
+describe('homeApi', () => {
+  const originalFetch = global.fetch;
+
+  beforeEach(() => {
+    localStorage.clear();
+  });
+
+  afterEach(() => {
+    global.fetch = originalFetch;
+  });
+
+  describe('get', () => {
+    it('returns leaderboards and live games in one request', async () => {
+      const mockHome = {
+        leaderboards: {
+          all: [{ rank: 1, username: 'Player1', score: 1000, mode: 'walls', date: '2023-01-01' }],
+          walls: [{ rank: 1, username: 'Player1', score: 1000, mode: 'walls', date: '2023-01-01' }],
+          'pass-through': [],
+        },
+        liveGames: [{ id: 'game1', playerName: 'Player1', currentScore: 100 }],
+      };
+      global.fetch = mockFetch(mockHome);
+
+      const home = await homeApi.get();
+
+      expect(global.fetch).toHaveBeenCalledTimes(1);
+      expect(home?.leaderboards.all[0].username).toBe('Player1');
+      expect(home?.leaderboards['pass-through']).toEqual([]);
+      expect(home?.liveGames[0].id).toBe('game1');
+    });
+
+    it('passes the limit', async () => {
+      global.fetch = mockFetch({ leaderboards: {}, liveGames: [] });
+
+      await homeApi.get(5);
+
+      expect(global.fetch).toHaveBeenCalledWith('/api/home?limit=5');
+    });
+
+    it('returns null on failure', async () => {
+      global.fetch = mockFetch({}, 500);
+
+      const home = await homeApi.get();
+
+      expect(home).toBeNull();
+    });
+  });
+});
+
 describe('spectatorApi', () => {
   const originalFetch = global.fetch;
 
@@ -10,7 +10,8 @@ import type {
   GameMode,
   Position,
   Direction,
-  GameState
+  GameState,
+  HomeData
 } from '@/types/game';
 
 const API_BASE_URL = '/api';
@@ -143,6 +144,26 @@ export const leaderboardApi = {
   },
 };
 
+// ============ HOME API ============
+
+export const homeApi = {
+  /**
+   * Everything the landing page needs in one round-trip: the leaderboard for
+   * every filter and the live games.
+   * Returns null on failure so callers can fall back to the individual endpoints.
+   */
+  async get(limit = 10): Promise<HomeData | null> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/home?limit=${limit}`);
+      if (!response.ok) throw new Error('Failed to fetch home data');
+      return await response.json();
+    } catch (err) {
+      console.error('Home data error:', err);
+      return null;
+    }
+  },
+};
+
 // ============ SPECTATOR API ============
 
 export const spectatorApi = {
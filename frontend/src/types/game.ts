@@ -65,6 +65,12 @@ export interface LiveGame {
   viewerCount: number;
 }
 
+// Landing page payload (GET /api/home)
+export interface HomeData {
+  leaderboards: Record<GameMode | 'all', LeaderboardEntry[]>;
+  liveGames: LiveGame[];
+}
+
 export interface SpectatorGameState extends GameState {
   gameId: string;
   playerName: string;